@@ -0,0 +1,287 @@
+"""Batch Markdown-to-HTML export for Bitpad notes.
+
+This module does not import Qt, so its export logic can run and be tested
+without a display. Pool workers are started with ``forkserver`` (or ``spawn``
+where that is unavailable), which re-imports ``main.py`` and therefore
+PySide6 once in the fork server or each spawned worker.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from i18n import lang
+from markdown import markdown
+
+RENDER_CACHE_FILE = os.path.expanduser("~/.bitpad_render_cache.json")
+
+# Extensions used for every render. They are part of the cache key, so
+# changing them invalidates previously exported files.
+MARKDOWN_EXTENSIONS = []
+MARKDOWN_EXTENSION_CONFIGS = {}
+
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+
+def render_markdown(text, extensions=None, extension_configs=None):
+    return markdown(
+        text,
+        extensions=MARKDOWN_EXTENSIONS if extensions is None else extensions,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS if extension_configs is None else extension_configs
+    )
+
+def render_key(text, extensions=None, extension_configs=None):
+    """Cache key for a note: hash of the extension config and the content."""
+    if extensions is None:
+        extensions = MARKDOWN_EXTENSIONS
+    if extension_configs is None:
+        extension_configs = MARKDOWN_EXTENSION_CONFIGS
+    config = json.dumps([extensions, extension_configs], sort_keys=True)
+    digest = hashlib.sha256(config.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+def safe_filename(name, default="note"):
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name).strip(" .")
+    return name or default
+
+def html_name(name):
+    root, ext = os.path.splitext(name)
+    if ext.lower() in MARKDOWN_SUFFIXES + (".txt",):
+        name = root
+    return safe_filename(name) + ".html"
+
+def collect_directory(directory):
+    """Yield a note for every Markdown file below ``directory``."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.lower().endswith(MARKDOWN_SUFFIXES):
+                continue
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, directory)
+            yield {
+                "output": os.path.join(os.path.dirname(relative), html_name(filename)),
+                "path": path
+            }
+
+def load_json_list(path):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f) or []
+    except Exception:
+        return []
+
+def tab_notes(tabs):
+    """Export notes for autosaved tabs, as stored in Bitpad's autosave file."""
+    for tab in tabs:
+        yield {
+            "output": html_name(tab.get("title") or lang("tabs.default_title")),
+            "content": tab.get("content", "")
+        }
+
+def bookmark_notes(bookmarks):
+    """Export notes for bookmarks, preferring the file on disk like BitPad.open_bookmarked_file."""
+    for bookmark in bookmarks:
+        note = {"output": html_name(bookmark.get("name") or bookmark.get("title", ""))}
+        file_path = bookmark.get("file_path")
+        if file_path and os.path.exists(file_path):
+            note["path"] = file_path
+        else:
+            note["content"] = bookmark.get("content", "")
+        yield note
+
+def load_render_cache(cache_file=RENDER_CACHE_FILE):
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_render_cache(entries, cache_file=RENDER_CACHE_FILE):
+    """Merge ``entries`` into the cache file and drop outputs that no longer exist.
+
+    The file is re-read just before writing so that exports running at the
+    same time keep each other's entries, and replaced atomically.
+    """
+    cache = load_render_cache(cache_file)
+    cache.update(entries)
+    cache = {path: key for path, key in cache.items() if os.path.exists(path)}
+
+    temp_path = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_file)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _pool_context():
+    # Export runs on a QThread in the GUI, and forking a multithreaded process
+    # can deadlock, so never use the "fork" start method.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def _export_note(output_path, cached_key, extensions, extension_configs, path=None, content=None):
+    """Render one note into ``output_path``. Runs inside a pool worker.
+
+    The extension config is passed in rather than read from the module, since
+    workers import a fresh copy of it.
+
+    Returns ``(output_path, key, rendered)``; ``rendered`` is False when the
+    existing output already matches the cached key.
+    """
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+    key = render_key(content, extensions, extension_configs)
+    if key == cached_key and os.path.exists(output_path):
+        return output_path, key, False
+
+    html = render_markdown(content, extensions, extension_configs)
+    del content
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = output_path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(temp_path, output_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path, key, True
+
+def export_notes(notes, output_dir, jobs=None, cache_file=RENDER_CACHE_FILE, progress=None, cancel=None):
+    """Render ``notes`` to HTML files in ``output_dir`` with a process pool.
+
+    Each note is a dict with an ``output`` file name relative to
+    ``output_dir`` and either a ``path`` to read or inline ``content``.
+    Notes are consumed lazily and at most ``2 * jobs`` are in flight, so
+    memory stays bounded however many notes are exported. ``progress`` is
+    called with the counts after every finished note. Setting the ``cancel``
+    event stops submitting notes and cancels those that have not started.
+
+    Returns a dict with ``rendered``, ``skipped`` and ``failed`` counts, a
+    ``cancelled`` flag, and
+    ``errors``: a ``(source, message)`` pair for every failed note, where
+    ``source`` is the note's ``path`` or, for inline content, its output name.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    output_dir = os.path.abspath(output_dir)
+    cache = load_render_cache(cache_file)
+    updated = {}
+    counts = {"rendered": 0, "skipped": 0, "failed": 0, "errors": [], "cancelled": False}
+    used_outputs = set()
+
+    def unique_output(name):
+        output_path = os.path.join(output_dir, name)
+        root, ext = os.path.splitext(output_path)
+        suffix = 2
+        while os.path.normcase(output_path) in used_outputs:
+            output_path = f"{root} ({suffix}){ext}"
+            suffix += 1
+        used_outputs.add(os.path.normcase(output_path))
+        return output_path
+
+    def collect(done):
+        for future in done:
+            source = pending.pop(future)
+            if future.cancelled():
+                continue
+            try:
+                output_path, key, rendered = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                counts["errors"].append((source, str(e) or type(e).__name__))
+            else:
+                updated[output_path] = key
+                counts["rendered" if rendered else "skipped"] += 1
+            if progress:
+                progress(counts)
+
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context()) as executor:
+        pending = {}
+        for note in notes:
+            if cancel is not None and cancel.is_set():
+                break
+            output_path = unique_output(note["output"])
+            cached_key = cache.get(output_path)
+            content = note.get("content")
+
+            # Inline content is hashed here so unchanged notes never reach the pool.
+            if content is not None and cached_key == render_key(content) and os.path.exists(output_path):
+                counts["skipped"] += 1
+                if progress:
+                    progress(counts)
+                continue
+
+            future = executor.submit(
+                _export_note, output_path, cached_key, MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS,
+                note.get("path"), content
+            )
+            pending[future] = note.get("path") or note["output"]
+            if len(pending) >= jobs * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        while pending:
+            if cancel is not None and cancel.is_set() and not counts["cancelled"]:
+                counts["cancelled"] = True
+                executor.shutdown(wait=False, cancel_futures=True)
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        counts["cancelled"] = cancel is not None and cancel.is_set()
+
+    save_render_cache(updated, cache_file)
+    return counts
+
+def format_export_errors(errors):
+    return "\n".join(f"{source}: {message}" for source, message in errors)
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return number
+
+def is_export_command(argv):
+    """True if ``argv`` asks for the headless export, as ``--export SOURCE`` or ``--export=SOURCE``."""
+    return any(arg == "--export" or arg.startswith("--export=") for arg in argv)
+
+def run_export(argv, tabs_file, bookmarks_file, cache_file=RENDER_CACHE_FILE):
+    """Headless batch export: main.py --export {tabs,bookmarks,DIR} OUTPUT_DIR"""
+    parser = argparse.ArgumentParser(prog="Bitpad", description="Export notes to HTML.")
+    parser.add_argument("--export", required=True, metavar="SOURCE",
+                        help="'tabs', 'bookmarks' or a directory of .md files")
+    parser.add_argument("output_dir", metavar="OUTPUT_DIR")
+    parser.add_argument("--jobs", type=positive_int, default=None, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    source = args.export
+    if source == "tabs":
+        notes = tab_notes(load_json_list(tabs_file))
+    elif source == "bookmarks":
+        notes = bookmark_notes(load_json_list(bookmarks_file))
+    elif os.path.isdir(source):
+        notes = collect_directory(source)
+    else:
+        parser.error(f"not a directory: {source}")
+
+    counts = export_notes(notes, args.output_dir, jobs=args.jobs, cache_file=cache_file)
+    print(lang("status.exported").format(**counts))
+    if counts["errors"]:
+        print(format_export_errors(counts["errors"]), file=sys.stderr)
+    return 1 if counts["failed"] else 0
@@ -1,23 +1,29 @@
 """Bitpad - a Developer-focused text editor for notes, ideas, and inspiration."""
 
 import json
+import multiprocessing
 import os
 import sys
+import threading
 from i18n import lang, set_language
-from markdown import markdown
 from PySide6.QtWidgets import (
     QMainWindow, QApplication, QTabWidget, QWidget, QStatusBar, QVBoxLayout, QTextEdit, QInputDialog,
     QMessageBox, QFileDialog, QToolBar, QPushButton, QSplitter, QTextBrowser
 )
 from PySide6.QtGui import (QAction, QKeySequence, QTextCursor, QTextDocument, QIcon)
-from PySide6.QtCore import QTimer, Qt, QPoint
+from PySide6.QtCore import QTimer, Qt, QPoint, QThread, Signal
 
 from dialogs import FindReplaceDialog, FindDialog
+from export import (
+    bookmark_notes, collect_directory, export_notes, format_export_errors, html_name, is_export_command,
+    load_json_list, render_markdown, run_export
+)
 
 set_language("en")
 
 PERSISTENCE_FILE = os.path.expanduser("~/.bitpad_autosave.json")
 BOOKMARKS_FILE = os.path.expanduser("~/.bitpad_bookmarks.json")
+EXPORT_LOG_FILE = os.path.expanduser("~/.bitpad_export.log")
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -27,6 +33,32 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+class ExportThread(QThread):
+    """Runs export_notes off the GUI thread and reports back through signals."""
+    progress = Signal(object)
+    finished_export = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, notes, output_dir, parent=None):
+        super().__init__(parent)
+        self.notes = notes
+        self.output_dir = output_dir
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            counts = export_notes(
+                self.notes, self.output_dir, progress=lambda counts: self.progress.emit(dict(counts)),
+                cancel=self.cancel_event
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished_export.emit(counts)
+
 class BitPad(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -47,6 +79,7 @@ class BitPad(QMainWindow):
         self.new_tab_action = QAction(lang("menubar.file.newtab"), self)
         self.save_action = QAction(lang("menubar.file.save"), self)
         self.save_as_action = QAction(lang("menubar.file.saveas"), self)
+        self.export_html_action = QAction(lang("menubar.file.export_html"), self)
         self.open_action = QAction(lang("menubar.file.open"), self)
         self.exit_action = QAction(lang("menubar.file.exit"), self)
         self.about_action = QAction(lang("menubar.help.about"), self)
@@ -63,6 +96,8 @@ class BitPad(QMainWindow):
         self.file_menu.addAction(self.save_action)
         self.file_menu.addAction(self.save_as_action)
         self.file_menu.addSeparator()
+        self.file_menu.addAction(self.export_html_action)
+        self.file_menu.addSeparator()
         self.file_menu.addAction(self.exit_action)
 
         self.help_menu.addAction(self.about_action)
@@ -99,6 +134,7 @@ class BitPad(QMainWindow):
         self.addToolBar(self.bookmarks_bar)
 
         self.bookmark_buttons = []
+        self.export_thread = None
 
         # ----- Shortcuts
         self.new_tab_action.setShortcut(QKeySequence.StandardKey.New)     # Ctrl+N
@@ -143,6 +179,7 @@ class BitPad(QMainWindow):
         self.save_action.triggered.connect(self.save_current_tab)
         self.save_as_action.triggered.connect(self.save_current_tab_as)
         self.open_action.triggered.connect(self.open_file)
+        self.export_html_action.triggered.connect(self.export_html)
         self.exit_action.triggered.connect(self.close)
         self.about_action.triggered.connect(self.about_dialog)
         self.undo_action.triggered.connect(self.undo_current_tab)
@@ -194,6 +231,11 @@ class BitPad(QMainWindow):
 
     def closeEvent(self, event):
         self.autosave()
+        if self.export_thread is not None:
+            # Only notes already being rendered are waited for; the rest are cancelled.
+            self.status.showMessage(lang("status.export_cancelling"))
+            self.export_thread.cancel()
+            self.export_thread.wait()
         event.accept()
 
     def setup_persistence(self):
@@ -324,6 +366,62 @@ class BitPad(QMainWindow):
             except Exception as e:
                 QMessageBox.warning(self, lang("error.open.title"), lang("error.open.message").format(error=str(e)))
 
+    def export_html(self):
+        sources = [
+            lang("dialog.export.source.tabs"),
+            lang("dialog.export.source.bookmarks"),
+            lang("dialog.export.source.directory")
+        ]
+        source, ok = QInputDialog.getItem(
+            self, lang("dialog.export.title"), lang("dialog.export.source"), sources, 0, False
+        )
+        if not ok:
+            return
+
+        if source == sources[0]:
+            notes = [
+                {
+                    "output": html_name(self.tabs.tabText(i)),
+                    "content": self.tabs.widget(i).editor.toPlainText()
+                }
+                for i in range(self.tabs.count())
+            ]
+        elif source == sources[1]:
+            notes = bookmark_notes(list(self.bookmarks))
+        else:
+            directory = QFileDialog.getExistingDirectory(self, lang("dialog.export.source.directory"))
+            if not directory:
+                return
+            notes = collect_directory(directory)
+
+        output_dir = QFileDialog.getExistingDirectory(self, lang("dialog.export.output"))
+        if not output_dir:
+            return
+
+        self.export_html_action.setEnabled(False)
+        self.export_thread = ExportThread(notes, output_dir, self)
+        self.export_thread.progress.connect(self.show_export_progress)
+        self.export_thread.finished_export.connect(self.export_finished)
+        self.export_thread.failed.connect(self.export_failed)
+        self.export_thread.finished.connect(self.export_thread_done)
+        self.export_thread.start()
+
+    def show_export_progress(self, counts):
+        self.status.showMessage(lang("status.exporting").format(**counts))
+
+    def export_finished(self, counts):
+        self.status.showMessage(lang("status.exported").format(**counts))
+        if counts["errors"]:
+            self.export_failed(format_export_errors(counts["errors"]))
+
+    def export_failed(self, error):
+        QMessageBox.warning(self, lang("error.export.title"), lang("error.export.message").format(error=error))
+
+    def export_thread_done(self):
+        self.export_thread.deleteLater()
+        self.export_thread = None
+        self.export_html_action.setEnabled(True)
+
     def undo_current_tab(self):
         current_editor = self.tabs.currentWidget()
         if current_editor:
@@ -394,13 +492,7 @@ class BitPad(QMainWindow):
             pass
 
     def load_bookmarks(self):
-        if not os.path.exists(BOOKMARKS_FILE):
-            return []
-        try:
-            with open(BOOKMARKS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
+        return load_json_list(BOOKMARKS_FILE)
 
     def add_bookmark(self):
         current_index = self.tabs.currentIndex()
@@ -492,10 +584,17 @@ class BitPad(QMainWindow):
         if not splitter.preview.isVisible():
             return
         text = splitter.editor.toPlainText()
-        html = markdown(text)
+        html = render_markdown(text)
         splitter.preview.setHtml(html)
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    if is_export_command(sys.argv[1:]):
+        if sys.stdout is None or sys.stderr is None:
+            # The --windowed build has no console, so keep the summary and errors in a log.
+            sys.stdout = sys.stderr = open(EXPORT_LOG_FILE, "w", encoding="utf-8")
+        sys.exit(run_export(sys.argv[1:], PERSISTENCE_FILE, BOOKMARKS_FILE))
+
     app = QApplication([])
     window = BitPad()
     window.show()
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import threading
+
+import pytest
+
+import export
+from export import (
+    bookmark_notes, collect_directory, export_notes, html_name, is_export_command, load_json_list,
+    positive_int, run_export, safe_filename, tab_notes
+)
+from i18n import set_language
+
+def run(notes, tmp_path):
+    return export_notes(notes, tmp_path / "out", jobs=2, cache_file=str(tmp_path / "cache.json"))
+
+def write_notes(tmp_path, files):
+    source = tmp_path / "notes"
+    for name, content in files.items():
+        path = source / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return source
+
+def test_html_name_sanitises_titles():
+    assert html_name("notes.md") == "notes.html"
+    assert html_name("a/b") == "a_b.html"
+    assert html_name("..") == "note.html"
+    assert safe_filename(' <x>? ') == "_x__"
+
+def test_directory_export_and_cache_hit(tmp_path):
+    source = write_notes(tmp_path, {"a.md": b"# A", "sub/b.md": b"*b*", "skip.txt": b"x"})
+
+    counts = run(collect_directory(source), tmp_path)
+    assert (counts["rendered"], counts["skipped"], counts["failed"]) == (2, 0, 0)
+    assert (tmp_path / "out" / "sub" / "b.html").read_text(encoding="utf-8") == "<p><em>b</em></p>"
+    assert not (tmp_path / "out" / "skip.html").exists()
+
+    counts = run(collect_directory(source), tmp_path)
+    assert (counts["rendered"], counts["skipped"]) == (0, 2)
+
+def test_cache_miss_on_changed_content_or_missing_output(tmp_path):
+    run([{"output": "a.html", "content": "one"}], tmp_path)
+
+    counts = run([{"output": "a.html", "content": "two"}], tmp_path)
+    assert counts["rendered"] == 1
+
+    os.remove(tmp_path / "out" / "a.html")
+    counts = run([{"output": "a.html", "content": "two"}], tmp_path)
+    assert counts["rendered"] == 1
+
+def test_extension_config_change_invalidates_cache(tmp_path, monkeypatch):
+    notes = [{"output": "a.html", "content": "| a |\n|---|\n| b |"}]
+    run(notes, tmp_path)
+
+    monkeypatch.setattr(export, "MARKDOWN_EXTENSIONS", ["tables"])
+    counts = run(notes, tmp_path)
+    assert counts["rendered"] == 1
+    assert "<table>" in (tmp_path / "out" / "a.html").read_text(encoding="utf-8")
+
+def test_colliding_outputs_get_numbered(tmp_path):
+    notes = [{"output": "a.html", "content": str(i)} for i in range(3)]
+    counts = run(notes, tmp_path)
+    assert counts["rendered"] == 3
+    assert sorted(os.listdir(tmp_path / "out")) == ["a (2).html", "a (3).html", "a.html"]
+
+def test_failures_are_counted_and_reported(tmp_path):
+    source = write_notes(tmp_path, {"a.md": b"ok", "c.md": b"\xff\xfe bad"})
+
+    counts = run(collect_directory(source), tmp_path)
+    assert (counts["rendered"], counts["failed"]) == (1, 1)
+    [(failed_source, message)] = counts["errors"]
+    assert failed_source == str(source / "c.md")
+    assert "utf-8" in message
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path / "out"))
+
+def test_load_json_list(tmp_path):
+    path = tmp_path / "data.json"
+    assert load_json_list(str(path)) == []
+    path.write_text("not json", encoding="utf-8")
+    assert load_json_list(str(path)) == []
+    path.write_text("null", encoding="utf-8")
+    assert load_json_list(str(path)) == []
+    path.write_text('[{"name": "a"}]', encoding="utf-8")
+    assert load_json_list(str(path)) == [{"name": "a"}]
+
+def test_tab_notes_use_title_and_content():
+    set_language("en")
+    notes = list(tab_notes([{"title": "Ideas.md", "content": "x"}, {"content": "y"}]))
+    assert notes == [
+        {"output": "Ideas.html", "content": "x"},
+        {"output": "Untitled.html", "content": "y"}
+    ]
+
+def test_bookmark_notes_prefer_file_on_disk(tmp_path):
+    note_file = tmp_path / "a.md"
+    note_file.write_text("# A", encoding="utf-8")
+    bookmarks = [
+        {"name": "On disk", "title": "a.md", "content": "stale", "file_path": str(note_file)},
+        {"name": "Gone", "title": "b.md", "content": "kept", "file_path": str(tmp_path / "missing.md")},
+        {"name": "", "title": "c.md", "content": "inline", "file_path": None}
+    ]
+    assert list(bookmark_notes(bookmarks)) == [
+        {"output": "On disk.html", "path": str(note_file)},
+        {"output": "Gone.html", "content": "kept"},
+        {"output": "c.html", "content": "inline"}
+    ]
+
+def test_positive_int():
+    assert positive_int("3") == 3
+    for value in ("0", "-1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)
+
+def test_is_export_command():
+    assert is_export_command(["--export", "tabs", "out"])
+    assert is_export_command(["--export=tabs", "out"])
+    assert not is_export_command([])
+    assert not is_export_command(["--exporter"])
+
+@pytest.mark.parametrize("argv", [["--export", "{source}", "{out}"], ["--export={source}", "{out}"]])
+def test_run_export_accepts_both_spellings(tmp_path, argv):
+    source = write_notes(tmp_path, {"a.md": b"# A"})
+    out = tmp_path / "out"
+    argv = [arg.format(source=source, out=out) for arg in argv]
+
+    status = run_export(argv + ["--jobs", "1"], "", "", cache_file=str(tmp_path / "cache.json"))
+    assert status == 0
+    assert (out / "a.html").read_text(encoding="utf-8") == "<h1>A</h1>"
+
+def test_run_export_tabs_and_bookmarks_sources(tmp_path):
+    tabs_file = tmp_path / "tabs.json"
+    tabs_file.write_text(json.dumps([{"title": "t", "content": "tab"}]), encoding="utf-8")
+    bookmarks_file = tmp_path / "bookmarks.json"
+    bookmarks_file.write_text(json.dumps([{"name": "b", "content": "mark"}]), encoding="utf-8")
+    cache_file = str(tmp_path / "cache.json")
+
+    assert run_export(["--export", "tabs", str(tmp_path / "out")], str(tabs_file), str(bookmarks_file), cache_file) == 0
+    assert run_export(["--export", "bookmarks", str(tmp_path / "out")], str(tabs_file), str(bookmarks_file), cache_file) == 0
+    assert (tmp_path / "out" / "t.html").read_text(encoding="utf-8") == "<p>tab</p>"
+    assert (tmp_path / "out" / "b.html").read_text(encoding="utf-8") == "<p>mark</p>"
+
+@pytest.mark.parametrize("argv", [
+    ["--export", "tabs", "out", "--jobs", "0"],
+    ["--export", "tabs", "out", "--jobs", "-1"],
+    ["--export", "missing-dir", "out"],
+    ["--export", "tabs"]
+])
+def test_run_export_rejects_bad_arguments(tmp_path, argv):
+    with pytest.raises(SystemExit) as excinfo:
+        run_export(argv, "", "", cache_file=str(tmp_path / "cache.json"))
+    assert excinfo.value.code == 2
+
+def test_run_export_reports_failures(tmp_path, capsys):
+    source = write_notes(tmp_path, {"c.md": b"\xff bad"})
+    status = run_export(["--export", str(source), str(tmp_path / "out")], "", "", cache_file=str(tmp_path / "cache.json"))
+    assert status == 1
+    assert str(source / "c.md") in capsys.readouterr().err
+
+def test_in_flight_notes_are_bounded_and_progress_reported(tmp_path):
+    jobs = 2
+    consumed = []
+    progress_calls = []
+
+    def notes():
+        for i in range(20):
+            consumed.append(i)
+            assert len(consumed) - len(progress_calls) <= 2 * jobs
+            yield {"output": f"{i}.html", "content": str(i)}
+
+    counts = export_notes(
+        notes(), tmp_path / "out", jobs=jobs, cache_file=str(tmp_path / "cache.json"),
+        progress=lambda counts: progress_calls.append(counts["rendered"])
+    )
+    assert counts["rendered"] == 20
+    assert len(progress_calls) == 20
+    assert progress_calls[-1] == 20
+
+def test_cancel_stops_submitting_notes(tmp_path):
+    cancel = threading.Event()
+    notes = [{"output": f"{i}.html", "content": str(i)} for i in range(50)]
+
+    counts = export_notes(
+        notes, tmp_path / "out", jobs=1, cache_file=str(tmp_path / "cache.json"),
+        progress=lambda counts: cancel.set(), cancel=cancel
+    )
+    assert counts["cancelled"]
+    assert counts["rendered"] < len(notes)
+    assert len(os.listdir(tmp_path / "out")) == counts["rendered"]
+
+def test_cache_prunes_missing_outputs_and_keeps_other_entries(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    other_output = tmp_path / "other.html"
+    other_output.write_text("", encoding="utf-8")
+    cache_file.write_text(json.dumps({
+        str(other_output): "other-key",
+        str(tmp_path / "deleted.html"): "stale-key"
+    }), encoding="utf-8")
+
+    export_notes([{"output": "a.html", "content": "a"}], tmp_path / "out", jobs=1, cache_file=str(cache_file))
+
+    cache = json.loads(cache_file.read_text(encoding="utf-8"))
+    assert set(cache) == {str(other_output), str(tmp_path / "out" / "a.html")}
+    assert cache[str(other_output)] == "other-key"
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))